@@ -132,7 +132,8 @@ gunicorn            : Start Baserow backend django using a prod ready gunicorn s
                          * Binds to BASEROW_BACKEND_BIND_ADDRESS which defaults to 0.0.0.0
 gunicorn-wsgi       : Same as gunicorn but runs a wsgi server which does not support WS
 celery-worker       : Start the celery worker queue which runs important async tasks
-celery-exportworker : Start the celery worker queue which runs slower async tasks
+celery-exportworker : Start the celery worker queue which runs slower async tasks and
+                      the user file thumbnail generation
 celery-beat         : Start the celery beat service used to schedule periodic jobs
 
 HEALTHCHECK COMMANDS (exit with non zero when unhealthy, zero when healthy)
@@ -322,7 +323,7 @@ case "$1" in
       if [[ -n "${BASEROW_RUN_MINIMAL}" && $BASEROW_AMOUNT_OF_WORKERS == "1" ]]; then
         export OTEL_SERVICE_NAME="celery-worker-combined"
         echo "Starting combined celery and export worker..."
-        start_celery_worker -Q celery,export -n default-worker@%h "${@:2}"
+        start_celery_worker -Q "celery,export,${BASEROW_USER_FILE_THUMBNAILS_QUEUE:-thumbnails}" -n default-worker@%h "${@:2}"
       else
         export OTEL_SERVICE_NAME="celery-worker"
         start_celery_worker -Q celery -n default-worker@%h "${@:2}"
@@ -339,7 +340,7 @@ case "$1" in
         while true; do sleep 2073600; done
       else
         export OTEL_SERVICE_NAME="celery-exportworker"
-        start_celery_worker -Q export -n export-worker@%h "${@:2}"
+        start_celery_worker -Q "export,${BASEROW_USER_FILE_THUMBNAILS_QUEUE:-thumbnails}" -n export-worker@%h "${@:2}"
       fi
     ;;
     celery-exportworker-healthcheck)
@@ -1,5 +1,11 @@
 from django.apps import AppConfig
+from django.urls import register_converter
 
 
 class ApiConfig(AppConfig):
     name = "baserow.api"
+
+    def ready(self):
+        from .converters import ApiNameOrIdConverter
+
+        register_converter(ApiNameOrIdConverter, "api_name_or_id")
@@ -0,0 +1,14 @@
+class ApiNameOrIdConverter:
+    """
+    Matches either the id or the `api_name` of an object in the url. The value is
+    provided to the view as a string, because the handlers look up the object by id
+    if it's numeric and by `api_name` otherwise.
+    """
+
+    regex = "[a-z0-9_]+"
+
+    def to_python(self, value: str) -> str:
+        return value
+
+    def to_url(self, value) -> str:
+        return str(value)
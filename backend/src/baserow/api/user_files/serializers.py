@@ -16,6 +16,11 @@ class UserFileUploadViaURLRequestSerializer(serializers.Serializer):
 class UserFileURLAndThumbnailsSerializerMixin(serializers.Serializer):
     url = serializers.SerializerMethodField()
     thumbnails = serializers.SerializerMethodField()
+    thumbnails_generated_at = serializers.DateTimeField(
+        read_only=True,
+        help_text="The last time the thumbnails have been generated. The thumbnails "
+        "are `null` until they have been generated.",
+    )
 
     def get_instance_attr(self, instance, name):
         return getattr(instance, name)
@@ -32,6 +37,9 @@ class UserFileURLAndThumbnailsSerializerMixin(serializers.Serializer):
         if not (self.get_instance_attr(instance, "is_image") or self.get_instance_attr(instance, "mime_type") in THUMBNAIL_MIME_TYPES):
             return None
 
+        if not self.get_thumbnails_generated(instance):
+            return None
+
         name = self.get_instance_attr(instance, "name")
 
         return {
@@ -45,6 +53,9 @@ class UserFileURLAndThumbnailsSerializerMixin(serializers.Serializer):
             for thumbnail_name, size in settings.USER_THUMBNAILS.items()
         }
 
+    def get_thumbnails_generated(self, instance):
+        return self.get_instance_attr(instance, "thumbnails_generated_at") is not None
+
 
 class UserFileSerializer(
     UserFileURLAndThumbnailsSerializerMixin, serializers.ModelSerializer
@@ -62,6 +73,7 @@ class UserFileSerializer(
             "uploaded_at",
             "url",
             "thumbnails",
+            "thumbnails_generated_at",
             "name",
             "original_name",
         )
@@ -140,6 +140,11 @@ BASEROW_GROUP_STORAGE_USAGE_QUEUE = os.getenv(
     "BASEROW_GROUP_STORAGE_USAGE_QUEUE", "export"
 )
 BASEROW_ROLE_USAGE_QUEUE = os.getenv("BASEROW_GROUP_STORAGE_USAGE_QUEUE", "export")
+# The thumbnails of uploaded user files are generated in their own queue, so that
+# they don't wait for slow exports and don't delay the realtime tasks.
+BASEROW_USER_FILE_THUMBNAILS_QUEUE = (
+    os.getenv("BASEROW_USER_FILE_THUMBNAILS_QUEUE") or "thumbnails"
+)
 
 CELERY_BROKER_URL = REDIS_URL
 CELERY_TASK_ROUTES = {
@@ -152,6 +157,9 @@ CELERY_TASK_ROUTES = {
     "baserow.core.usage.tasks": {"queue": BASEROW_GROUP_STORAGE_USAGE_QUEUE},
     "baserow.contrib.database.table.tasks.run_row_count_job": {"queue": "export"},
     "baserow.core.jobs.tasks.clean_up_jobs": {"queue": "export"},
+    "baserow.core.user_files.tasks.generate_user_file_thumbnails": {
+        "queue": BASEROW_USER_FILE_THUMBNAILS_QUEUE
+    },
 }
 CELERY_SOFT_TIME_LIMIT = 60 * 5  # 5 minutes
 CELERY_TIME_LIMIT = CELERY_SOFT_TIME_LIMIT + 60  # 60 seconds
@@ -9,6 +9,7 @@ from baserow.api.user_files.serializers import UserFileURLAndThumbnailsSerialize
 from baserow.api.user_files.validators import user_file_name_validator
 from baserow.contrib.database.fields.models import Field
 from baserow.contrib.database.fields.registries import field_type_registry
+from baserow.core.user_files.models import UserFile
 
 
 class FieldSerializer(serializers.ModelSerializer):
@@ -151,10 +152,28 @@ class FileFieldResponseSerializer(
     image_width = serializers.IntegerField()
     image_height = serializers.IntegerField()
     uploaded_at = serializers.DateTimeField()
+    # The `thumbnails_generated_at` stored in the cell is only updated when the cell
+    # value changes, so it's not exposed because it can be outdated.
+    thumbnails_generated_at = None
 
     def get_instance_attr(self, instance, name):
         return instance[name]
 
+    def get_thumbnails_generated(self, instance):
+        # Cell values stored before the thumbnails were generated in the background
+        # don't contain the key, the thumbnails of those files already exist.
+        if instance.get("thumbnails_generated_at", True) is not None:
+            return True
+
+        # The cell value was stored while the thumbnails were still being generated,
+        # so the current state of the user file is looked up.
+        return (
+            UserFile.objects.all()
+            .name(instance["name"])
+            .filter(thumbnails_generated_at__isnull=False)
+            .exists()
+        )
+
 
 @extend_schema_field(OpenApiTypes.NONE)
 class MustBeEmptyField(serializers.Field):
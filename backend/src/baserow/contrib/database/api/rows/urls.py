@@ -1,4 +1,4 @@
-from django.urls import re_path
+from django.urls import include, path
 
 from .views import (
     BatchDeleteRowsView,
@@ -12,36 +12,18 @@ from .views import (
 
 app_name = "baserow.contrib.database.api.rows"
 
+# The table endpoints are grouped under their shared prefix so that it's only
+# matched once when resolving a request.
+table_urlpatterns = [
+    path("", RowsView.as_view(), name="list"),
+    path("<int:row_id>/", RowView.as_view(), name="item"),
+    path("<int:row_id>/adjacent/", RowAdjacentView.as_view(), name="adjacent"),
+    path("batch/", BatchRowsView.as_view(), name="batch"),
+    path("batch-delete/", BatchDeleteRowsView.as_view(), name="batch-delete"),
+    path("<int:row_id>/move/", RowMoveView.as_view(), name="move"),
+]
+
 urlpatterns = [
-    re_path(r"table/(?P<table_id>[a-z0-9_]+)/$", RowsView.as_view(), name="list"),
-    re_path(
-        r"table/(?P<table_id>[a-z0-9_]+)/(?P<row_id>[0-9]+)/$",
-        RowView.as_view(),
-        name="item",
-    ),
-    re_path(
-        r"table/(?P<table_id>[a-z0-9_]+)/(?P<row_id>[0-9]+)/adjacent/$",
-        RowAdjacentView.as_view(),
-        name="adjacent",
-    ),
-    re_path(
-        r"table/(?P<table_id>[a-z0-9_]+)/batch/$",
-        BatchRowsView.as_view(),
-        name="batch",
-    ),
-    re_path(
-        r"table/(?P<table_id>[a-z0-9_]+)/batch-delete/$",
-        BatchDeleteRowsView.as_view(),
-        name="batch-delete",
-    ),
-    re_path(
-        r"table/(?P<table_id>[a-z0-9_]+)/(?P<row_id>[0-9]+)/move/$",
-        RowMoveView.as_view(),
-        name="move",
-    ),
-    re_path(
-        r"names/$",
-        RowNamesView.as_view(),
-        name="names",
-    ),
+    path("table/<api_name_or_id:table_id>/", include(table_urlpatterns)),
+    path("names/", RowNamesView.as_view(), name="names"),
 ]
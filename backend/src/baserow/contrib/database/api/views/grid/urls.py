@@ -1,4 +1,4 @@
-from django.urls import re_path
+from django.urls import include, path
 
 from .views import (
     GridViewFieldAggregationsView,
@@ -9,20 +9,26 @@ from .views import (
 
 app_name = "baserow.contrib.database.api.views.grid"
 
-urlpatterns = [
-    re_path(
-        r"(?P<view_id>[0-9]+)/aggregation/(?P<field_id>[a-z0-9_]+)/$",
+# The view endpoints are grouped under their shared prefix so that it's only
+# matched once when resolving a request.
+view_urlpatterns = [
+    path(
+        "aggregation/<api_name_or_id:field_id>/",
         GridViewFieldAggregationView.as_view(),
         name="field-aggregation",
     ),
-    re_path(
-        r"(?P<view_id>[0-9]+)/aggregations/$",
+    path(
+        "aggregations/",
         GridViewFieldAggregationsView.as_view(),
         name="field-aggregations",
     ),
-    re_path(r"(?P<view_id>[0-9]+)/$", GridViewView.as_view(), name="list"),
-    re_path(
-        r"(?P<slug>[-\w]+)/public/rows/$",
+    path("", GridViewView.as_view(), name="list"),
+]
+
+urlpatterns = [
+    path("<int:view_id>/", include(view_urlpatterns)),
+    path(
+        "<slug:slug>/public/rows/",
         PublicGridViewRowsView.as_view(),
         name="public_rows",
     ),
@@ -7,6 +7,11 @@ from django.core.management.base import BaseCommand
 from baserow.core.handler import CoreHandler
 from baserow.core.models import Application
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class Command(BaseCommand):
     help = (
@@ -24,7 +29,9 @@ class Command(BaseCommand):
             "--indent",
             action="store_true",
             help="Indicates if the JSON must be formatted and indented to improve "
-            "readability.",
+            "readability. This is meant for debugging because it makes the export "
+            "slower and larger. The JSON is indented with two spaces if orjson is "
+            "installed, otherwise with four.",
         )
         parser.add_argument(
             "--name",
@@ -57,7 +64,21 @@ class Command(BaseCommand):
                 application, files_buffer=files_buffer
             )
 
-        with open(export_path, "w") as export_buffer:
-            json.dump(
-                [exported_application,], export_buffer, indent=4 if indent else None
-            )
+        if orjson is not None:
+            # orjson encodes the whole export at once and only supports an indent of
+            # two spaces.
+            option = orjson.OPT_NON_STR_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+
+            with open(export_path, "wb") as export_buffer:
+                export_buffer.write(orjson.dumps([exported_application], option=option))
+        else:
+            # The JSON encoder writes many small chunks, so a large buffer is used to
+            # reduce the amount of write calls for big applications.
+            with open(export_path, "w", buffering=1024 * 1024) as export_buffer:
+                json.dump(
+                    [exported_application,],
+                    export_buffer,
+                    indent=4 if indent else None,
+                )
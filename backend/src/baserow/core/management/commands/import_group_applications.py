@@ -51,7 +51,7 @@ class Command(BaseCommand):
         import_path = os.path.join(current_path, f"{name}.json")
         handler = CoreHandler()
 
-        with open(import_path, "r") as import_buffer:
+        with open(import_path, "r", encoding="utf-8") as import_buffer:
             content = json.load(import_buffer)
             files_buffer = None
 
@@ -1,18 +1,45 @@
-import mimetypes
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from multiprocessing import get_context
 
+import django
 from django.core.files.storage import default_storage
 from django.core.management.base import BaseCommand
 
-from PIL import Image
-
 from baserow.core.user_files.handler import UserFileHandler
 from baserow.core.user_files.models import UserFile
 
 
+def regenerate_thumbnails(user_file_id, only_with_name=None):
+    """
+    Regenerates the thumbnails of a single user file. This function is executed in a
+    worker process, which is why only the id of the user file is provided and the
+    user file is fetched again.
+
+    :param user_file_id: The id of the user file to regenerate the thumbnails for.
+    :type user_file_id: int
+    :param only_with_name: If provided, then only thumbnail types with that name
+        will be regenerated.
+    :type only_with_name: None or String
+    """
+
+    try:
+        user_file = UserFile.objects.get(pk=user_file_id)
+    except UserFile.DoesNotExist:
+        return
+
+    UserFileHandler().generate_and_save_stored_file_thumbnails(
+        user_file, storage=default_storage, only_with_name=only_with_name
+    )
+
+
 class Command(BaseCommand):
     help = (
         "Regenerates all the user file thumbnails based on the current settings. "
-        "Existing files will be overwritten."
+        "Existing files will be overwritten. The resampling is CPU bound, the "
+        "Pillow-SIMD build installed in the x86_64 docker images is required for "
+        "the fastest regeneration."
     )
 
     def add_arguments(self, parser):
@@ -23,6 +50,13 @@ class Command(BaseCommand):
             help="The name of the thumbnails to regenerate (tiny, small or card_cover).",
             default=None,
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="The amount of processes that regenerate thumbnails in parallel. "
+            "Defaults to the number of CPUs.",
+            default=os.cpu_count(),
+        )
 
     def handle(self, *args, **options):
         """
@@ -31,42 +65,51 @@ class Command(BaseCommand):
         """
 
         i = 0
-        handler = UserFileHandler()
+        failed = 0
         buffer_size = 100
-        queryset = UserFile.objects.all()
-        count = queryset.count()
-
-        while i < count:
-            user_files = queryset[i : min(count, i + buffer_size)]
-            for user_file in user_files:
-                i += 1
-
-                full_path = handler.user_file_path(user_file)
-                mime_type = mimetypes.guess_type(full_path)[0]
-                try:
-                    stream = default_storage.open(full_path)
-                except FileNotFoundError:
-                    continue
-
-                image = None
-
-                try:
-                    image = Image.open(stream)
-                except IOError:
-                    pass
-
-                handler.generate_and_save_file_thumbnails(
-                    stream,
-                    mime_type,
-                    image,
-                    user_file,
-                    storage=default_storage,
-                    only_with_name=options["name"],
-                )
-
-                stream.close()
-
-                if image:
-                    image.close()
-
-        self.stdout.write(self.style.SUCCESS(f"{i} thumbnails have been regenerated."))
+        user_file_ids = (
+            UserFile.objects.all()
+            .values_list("pk", flat=True)
+            .iterator(chunk_size=buffer_size)
+        )
+        # Only a limited amount of user files is submitted at the same time, so that
+        # the ids are streamed from the database while the workers are busy
+        # instead of all being queued in memory up front.
+        max_pending = options["workers"] * 4
+        pending = {}
+
+        # The workers are spawned instead of forked so that they don't share the
+        # database connection of this process, they set up Django themselves.
+        with ProcessPoolExecutor(
+            max_workers=options["workers"],
+            mp_context=get_context("spawn"),
+            initializer=django.setup,
+        ) as executor:
+            while True:
+                for user_file_id in islice(user_file_ids, max_pending - len(pending)):
+                    future = executor.submit(
+                        regenerate_thumbnails, user_file_id, options["name"]
+                    )
+                    pending[future] = user_file_id
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    user_file_id = pending.pop(future)
+                    try:
+                        future.result()
+                    except Exception as exc:
+                        failed += 1
+                        self.stderr.write(f"{user_file_id}: {exc}")
+
+                    i += 1
+                    if i % buffer_size == 0:
+                        self.stdout.write(f"{i} user files processed.")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{i - failed} thumbnails have been regenerated, {failed} failed."
+            )
+        )
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.18 on 2026-10-14 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0045_group_now"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userfile",
+            name="thumbnails_generated_at",
+            field=models.DateTimeField(
+                help_text="The last time the thumbnails of the file have been "
+                "generated. Stays empty while the thumbnails are still being "
+                "generated.",
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+from django.db.models import F, Q
+
+# A copy of `THUMBNAIL_MIME_TYPES` of the user files handler at the time of this
+# migration.
+THUMBNAIL_MIME_TYPES = [
+    "application/pdf",
+    "application/vnd.ms-powerpoint",
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    "application/vnd.oasis.opendocument.presentation",
+    "application/msword",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "application/vnd.oasis.opendocument.text",
+    "application/vnd.ms-excel",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "application/vnd.oasis.opendocument.spreadsheet",
+]
+
+
+def backfill_thumbnails_generated_at(apps, schema_editor):
+    # The thumbnails of the files uploaded before this migration have been
+    # generated during the upload.
+    UserFile = apps.get_model("core", "UserFile")
+    UserFile.objects.filter(
+        Q(is_image=True) | Q(mime_type__in=THUMBNAIL_MIME_TYPES),
+        thumbnails_generated_at__isnull=True,
+    ).update(thumbnails_generated_at=F("uploaded_at"))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0046_userfile_thumbnails_generated_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            backfill_thumbnails_generated_at, reverse_code=migrations.RunPython.noop
+        ),
+    ]
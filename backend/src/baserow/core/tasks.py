@@ -12,6 +12,7 @@ from .trash.tasks import (
 )
 from .usage.tasks import run_calculate_storage
 from .user.tasks import check_pending_account_deletion
+from .user_files.tasks import generate_user_file_thumbnails
 
 
 @app.task(
@@ -36,4 +37,5 @@ __all__ = [
     "check_pending_account_deletion",
     "delete_expired_snapshots",
     "initialize_otel",
+    "generate_user_file_thumbnails",
 ]
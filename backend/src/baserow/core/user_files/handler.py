@@ -1,19 +1,24 @@
 import mimetypes
-import pathlib
+import os
 import tempfile
 import re
+import shutil
 import traceback
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from subprocess import check_output, STDOUT
 from os.path import join
-from typing import Optional
+from typing import Optional, Tuple
 from urllib.parse import urlparse
-from pdf2image import convert_from_bytes
+from pdf2image import convert_from_path
 
 from django.conf import settings
+from django.core.files import File
 from django.core.files.storage import default_storage
-from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
 from django.db.models import QuerySet
+from django.utils import timezone
 
 import advocate
 from advocate.exceptions import UnacceptableAddressException
@@ -30,6 +35,7 @@ from .exceptions import (
     MaximumUniqueTriesError,
 )
 from .models import UserFile
+from .tasks import generate_user_file_thumbnails
 
 # all non-image file types which can have thumbnails generated
 THUMBNAIL_MIME_TYPES = {
@@ -57,7 +63,114 @@ DOCUMENT_CONVERSION_MAP = {
     "application/vnd.oasis.opendocument.spreadsheet": "calc",
 }
 
+# The amount of unique candidates that are checked with a single query when
+# generating a unique for a new user file.
+GENERATE_UNIQUE_BATCH_SIZE = 16
+
+# The maximum amount of threads that generate the thumbnails of a single user file.
+MAX_THUMBNAIL_WORKERS = 4
+
+# The maximum amount of bytes of a file downloaded by URL that is kept in memory
+# before it's written to a temporary file on disk.
+UPLOAD_BY_URL_SPOOL_SIZE = 5 * 1024 * 1024
+
 CONVERT_OUT_PATTERN = re.compile(r"^convert .*? -> (.*?) using filter : .*_Export$")
+EXTENSION_PATTERN = re.compile(r"\.[^.]+$")
+
+# The Pillow formats that are tried first when opening an image with a known mime
+# type, so that Pillow doesn't have to probe every registered decoder.
+_MIME_TO_PIL_FORMAT = {
+    "image/jpeg": ["JPEG"],
+    "image/png": ["PNG"],
+    "image/gif": ["GIF"],
+    "image/webp": ["WEBP"],
+}
+
+
+@lru_cache(maxsize=1024)
+def _guess_mime_type_by_extension(extension: str) -> Optional[str]:
+    return mimetypes.guess_type(f"file{extension}")[0]
+
+
+def get_extension_and_mime_type(file_name: str) -> Tuple[str, Optional[str]]:
+    """
+    Extracts the extension and guesses the mime type of the provided file name with
+    a single split of the name. The mime type is cached per extension because it's
+    looked up for every upload and for every thumbnail of every user file.
+
+    :param file_name: The name or path of the file.
+    :return: The lowercase extension without the leading dot and the guessed mime
+        type or None if it could not be guessed.
+    """
+
+    extension = os.path.splitext(file_name)[1]
+
+    # Compressed files like `.tar.gz` depend on more than the last extension.
+    if extension in mimetypes.encodings_map:
+        mime_type = mimetypes.guess_type(file_name)[0]
+    else:
+        mime_type = _guess_mime_type_by_extension(extension)
+
+    return extension[1:].lower(), mime_type
+
+
+def guess_mime_type(file_name: str) -> Optional[str]:
+    """
+    Guesses the mime type of the provided file name based on its extension.
+
+    :param file_name: The name or path of the file.
+    :return: The guessed mime type or None if it could not be guessed.
+    """
+
+    return get_extension_and_mime_type(file_name)[1]
+
+
+def open_image(stream, mime_type):
+    """
+    Opens the provided stream with Pillow. If the mime type, which is guessed based
+    on the file name, maps to a Pillow format then only that decoder is tried first.
+    Because the file name could be wrong, all formats are tried if that fails.
+
+    :param stream: An IO stream containing the file.
+    :type stream: IOBase
+    :param mime_type: The guessed mime type of the file.
+    :type mime_type: str or None
+    :raises IOError: If the stream can't be opened as an image.
+    :return: The opened image.
+    :rtype: Image
+    """
+
+    formats = _MIME_TO_PIL_FORMAT.get(mime_type)
+
+    if formats:
+        try:
+            return Image.open(stream, formats=formats)
+        except IOError:
+            stream.seek(0)
+
+    return Image.open(stream)
+
+
+def convert_pdf_to_image(stream):
+    """
+    Converts the first page of the PDF in the provided stream to an image. The
+    stream is copied to a temporary file in chunks, so that poppler can read it
+    from disk without the whole PDF being loaded into memory.
+
+    :param stream: An IO stream containing the PDF.
+    :return: The Pillow image of the first page.
+    """
+
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as tmp:
+        stream.seek(0)
+        shutil.copyfileobj(stream, tmp)
+        tmp.flush()
+        stream.seek(0)
+
+        return convert_from_path(
+            tmp.name, fmt="jpeg", single_file=True, first_page=1, last_page=1
+        )[0]
+
 
 def convert_document_to_image(stream, mime_type):
     suffix = THUMBNAIL_MIME_TYPES[mime_type]
@@ -66,12 +179,24 @@ def convert_document_to_image(stream, mime_type):
     stream.seek(0)
 
     with tempfile.TemporaryDirectory() as tmp_dir:
-        convert_output = check_output(f"soffice --headless --convert-to pdf:{DOCUMENT_CONVERSION_MAP[mime_type]}_pdf_Export --outdir {tmp_dir} {tmp.name}", shell=True, stderr=STDOUT).decode("utf-8")
+        convert_output = check_output(
+            [
+                "soffice",
+                "--headless",
+                "--convert-to",
+                f"pdf:{DOCUMENT_CONVERSION_MAP[mime_type]}_pdf_Export",
+                "--outdir",
+                tmp_dir,
+                tmp.name,
+            ],
+            stderr=STDOUT,
+        ).decode("utf-8")
         match = CONVERT_OUT_PATTERN.match(convert_output)
         if match:
             out_pdf_path = match.group(1)
-            with open(out_pdf_path, "rb") as pdf_stream:
-                image = convert_from_bytes(pdf_stream.read(), fmt="jpeg", single_file=True)[0]
+            image = convert_from_path(
+                out_pdf_path, fmt="jpeg", single_file=True, first_page=1, last_page=1
+            )[0]
 
         else:
             raise Exception("Could not convert document to image. Convert command output: " + convert_output)
@@ -130,8 +255,8 @@ class UserFileHandler:
         if isinstance(user_file_name, UserFile):
             user_file_name = user_file_name.name
 
-        if mimetypes.guess_type(user_file_name)[0] in THUMBNAIL_MIME_TYPES:
-            user_file_name = f"{'.'.join(user_file_name.split('.')[:-1])}.jpg"
+        if guess_mime_type(user_file_name) in THUMBNAIL_MIME_TYPES:
+            user_file_name = f"{EXTENSION_PATTERN.sub('', user_file_name)}.jpg"
 
         return join(settings.USER_THUMBNAILS_DIRECTORY, thumbnail_name, user_file_name)
 
@@ -156,21 +281,82 @@ class UserFileHandler:
         :rtype: str
         """
 
-        i = 0
+        # Multiple candidates are checked in a single query, so that a collision
+        # doesn't result in an additional query for every retry.
+        tries = 0
+        while tries <= max_tries:
+            batch_size = min(GENERATE_UNIQUE_BATCH_SIZE, max_tries + 1 - tries)
+            tries += batch_size
+            candidates = [random_string(length) for _ in range(batch_size)]
+            existing = set(
+                UserFile.objects.filter(
+                    sha256_hash=sha256_hash,
+                    original_extension=extension,
+                    unique__in=candidates,
+                ).values_list("unique", flat=True)
+            )
 
-        while True:
-            if i > max_tries:
-                raise MaximumUniqueTriesError(
-                    f"Tried {max_tries} tokens, but none of them are unique."
-                )
+            for unique in candidates:
+                if unique not in existing:
+                    return unique
+
+        raise MaximumUniqueTriesError(
+            f"Tried {max_tries} tokens, but none of them are unique."
+        )
+
+    def _resize_thumbnail(self, image, size, keep_aspect_ratio):
+        """
+        Resizes the provided image to the provided thumbnail size without modifying
+        the original image. If the aspect ratio is kept, the size is already
+        computed from the image dimensions, so the image is resized straight to that
+        size. The reducing gap lets Pillow reduce the image before resampling.
+        Otherwise the image is cropped to fit the size exactly.
+
+        :param image: The Pillow image that must be resized.
+        :type image: Image
+        :param size: The width and height of the thumbnail.
+        :type size: tuple
+        :param keep_aspect_ratio: Whether the size has the same aspect ratio as the
+            image, in which case no cropping is needed.
+        :type keep_aspect_ratio: bool
+        :return: The resized image.
+        :rtype: Image
+        """
 
-            i += 1
-            unique = random_string(length)
+        if keep_aspect_ratio:
+            return image.resize(size, Image.LANCZOS, reducing_gap=3.0)
+
+        return ImageOps.fit(image, size, Image.LANCZOS)
+
+    def _generate_and_save_file_thumbnail(
+        self, image, user_file, name, size, keep_aspect_ratio, storage
+    ):
+        """
+        Generates a single thumbnail of the provided image and saves it to the
+        provided storage.
+
+        :param image: The loaded Pillow image that serves as base for the thumbnail.
+            It's not modified, so it can be shared between threads.
+        :type image: Image
+        :param user_file: The user file for which the thumbnail is generated.
+        :type user_file: UserFile
+        :param name: The thumbnail type name.
+        :type name: str
+        :param size: The width and height of the thumbnail.
+        :type size: tuple
+        :param keep_aspect_ratio: Whether the size has the same aspect ratio as the
+            image.
+        :type keep_aspect_ratio: bool
+        :param storage: The storage where the thumbnail must be saved to.
+        :type storage: Storage
+        """
 
-            if not UserFile.objects.filter(
-                sha256_hash=sha256_hash, original_extension=extension, unique=unique
-            ).exists():
-                return unique
+        thumbnail = self._resize_thumbnail(image, size, keep_aspect_ratio)
+        thumbnail_stream = BytesIO()
+        thumbnail.save(thumbnail_stream, image.format)
+        thumbnail_stream.seek(0)
+        thumbnail_path = self.user_file_thumbnail_path(user_file, name)
+        storage.save(thumbnail_path, thumbnail_stream)
 
     def generate_and_save_file_thumbnails(
         self, stream, mime_type, image, user_file, storage=None, only_with_name=None
@@ -207,8 +393,7 @@ class UserFileHandler:
             image_height = user_file.image_height
         elif mime_type == "application/pdf":
             try:
-                image = convert_from_bytes(stream.read(), fmt="jpeg", single_file=True)[0]
-                stream.seek(0)
+                image = convert_pdf_to_image(stream)
             except Exception:
                 traceback.print_exc()
                 return False
@@ -225,11 +410,13 @@ class UserFileHandler:
             image_width = image.width
             image_height = image.height
 
+        thumbnail_sizes = []
         for name, size in settings.USER_THUMBNAILS.items():
             if only_with_name and only_with_name != name:
                 continue
 
             size_copy = size.copy()
+            keep_aspect_ratio = size_copy[0] is None or size_copy[1] is None
 
             # If the width or height is None we want to keep the aspect ratio.
             if size_copy[0] is None and size_copy[1] is not None:
@@ -237,23 +424,108 @@ class UserFileHandler:
             elif size_copy[1] is None and size_copy[0] is not None:
                 size_copy[1] = round(image_height / image_width * size_copy[0])
 
-            thumbnail = ImageOps.fit(image.copy(), size_copy, Image.ANTIALIAS)
-            thumbnail_stream = BytesIO()
-            thumbnail.save(thumbnail_stream, image.format)
-            thumbnail_stream.seek(0)
-            thumbnail_path = self.user_file_thumbnail_path(user_file, name)
-            storage.save(thumbnail_path, thumbnail_stream)
+            thumbnail_sizes.append((name, tuple(size_copy), keep_aspect_ratio))
+
+        if not thumbnail_sizes:
+            return True
+
+        # JPEG images can be decoded at a reduced scale that is still larger than the
+        # biggest thumbnail, which is a lot cheaper than decoding the full image.
+        if image.format == "JPEG":
+            image.draft(
+                "RGB",
+                (
+                    max(size[0] for _, size, _ in thumbnail_sizes),
+                    max(size[1] for _, size, _ in thumbnail_sizes),
+                ),
+            )
+
+        # The image is loaded before it's shared with the threads, because lazily
+        # loading it from multiple threads at the same time isn't safe. Pillow
+        # releases the GIL while resampling, so the thumbnails are generated and
+        # saved in parallel.
+        image.load()
+        max_workers = min(len(thumbnail_sizes), MAX_THUMBNAIL_WORKERS)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(
+                    self._generate_and_save_file_thumbnail,
+                    image,
+                    user_file,
+                    name,
+                    size,
+                    keep_aspect_ratio,
+                    storage,
+                )
+                for name, size, keep_aspect_ratio in thumbnail_sizes
+            ]
+            for future in futures:
+                future.result()
+
+        user_file.thumbnails_generated_at = timezone.now()
+        user_file.save(update_fields=["thumbnails_generated_at"])
 
-            del thumbnail
-            del thumbnail_stream
-        
         return True
 
+    def generate_and_save_stored_file_thumbnails(
+        self, user_file, storage=None, only_with_name=None
+    ):
+        """
+        Opens the already saved file of the provided user file and generates and
+        saves its thumbnails. This is used when the thumbnails are generated
+        separately from the upload, for example in a background task.
+
+        :param user_file: The user file for which the thumbnails must be generated
+            and saved.
+        :type user_file: UserFile
+        :param storage: The storage where the file is saved and where the thumbnails
+            must be saved to.
+        :type storage: Storage or None
+        :param only_with_name: If provided, then only thumbnail types with that name
+            will be regenerated.
+        :type only_with_name: None or String
+        :return: Whether or not thumbnails have been generated and saved.
+        :rtype: bool
+        """
+
+        storage = storage or default_storage
+        full_path = self.user_file_path(user_file)
+        mime_type = guess_mime_type(full_path)
+
+        try:
+            stream = storage.open(full_path)
+        except FileNotFoundError:
+            return False
+
+        image = None
+
+        try:
+            image = open_image(stream, mime_type)
+        except IOError:
+            pass
+
+        try:
+            return self.generate_and_save_file_thumbnails(
+                stream,
+                mime_type,
+                image,
+                user_file,
+                storage=storage,
+                only_with_name=only_with_name,
+            )
+        finally:
+            stream.close()
+
+            if image:
+                image.close()
+
     def upload_user_file(self, user, file_name, stream, storage=None):
         """
         Saves the provided uploaded file in the provided storage. If no storage is
         provided the default_storage will be used. An entry into the user file table
-        is also created.
+        is also created. If no storage is provided, the thumbnails are generated in a
+        background task after the transaction commits, otherwise they're generated
+        before this method returns.
 
         :param user: The user on whose behalf the file is uploaded.
         :type user: User
@@ -280,6 +552,9 @@ class UserFileHandler:
                 "The provided file is too large.",
             )
 
+        # The thumbnails of files saved in the default storage are generated
+        # asynchronously because the worker can read the file from that storage.
+        generate_thumbnails_async = storage is None
         storage = storage or default_storage
         hash = sha256_hash(stream)
         file_name = truncate_middle(file_name, 64)
@@ -291,8 +566,7 @@ class UserFileHandler:
         #// if existing_user_file:
         #//     return existing_user_file
 
-        extension = pathlib.Path(file_name).suffix[1:].lower()
-        mime_type = mimetypes.guess_type(file_name)[0]
+        extension, mime_type = get_extension_and_mime_type(file_name)
         unique = self.generate_unique(hash, extension)
 
         # By default the provided file is not an image.
@@ -304,7 +578,7 @@ class UserFileHandler:
         # Try to open the image with Pillow. If that succeeds we know the file is an
         # image.
         try:
-            image = Image.open(stream)
+            image = open_image(stream, mime_type)
             is_image = True
             image_width = image.width
             image_height = image.height
@@ -324,15 +598,24 @@ class UserFileHandler:
             image_height=image_height,
         )
 
-        # If the uploaded file is an image we need to generate the configurable
-        # thumbnails for it. We want to generate them before the file is saved to the
-        # storage because some storages close the stream after saving.
-        stream.seek(0)
-        self.generate_and_save_file_thumbnails(stream, mime_type, image, user_file, storage=storage)
-
-        # Save the file to the storage.
         full_path = self.user_file_path(user_file)
-        storage.save(full_path, stream)
+
+        if generate_thumbnails_async:
+            storage.save(full_path, stream)
+
+            if is_image or mime_type in THUMBNAIL_MIME_TYPES:
+                transaction.on_commit(
+                    lambda: generate_user_file_thumbnails.delay(user_file.id)
+                )
+        else:
+            # If the uploaded file is an image we need to generate the configurable
+            # thumbnails for it. We want to generate them before the file is saved to
+            # the storage because some storages close the stream after saving.
+            stream.seek(0)
+            self.generate_and_save_file_thumbnails(
+                stream, mime_type, image, user_file, storage=storage
+            )
+            storage.save(full_path, stream)
 
         # Close the stream because we don't need it anymore.
         stream.close()
@@ -368,6 +651,10 @@ class UserFileHandler:
         # a URL with a querystring) and then extract the filename.
         file_name = parsed_url.path.split("/")[-1]
 
+        # The downloaded content is kept in memory until it exceeds the spool size,
+        # after which it's written to a temporary file on disk.
+        content = tempfile.SpooledTemporaryFile(max_size=UPLOAD_BY_URL_SPOOL_SIZE)
+
         try:
             response = advocate.get(url, stream=True, timeout=10)
 
@@ -386,17 +673,23 @@ class UserFileHandler:
             except ValueError:
                 pass
 
-            content = b""
-            for chunk in response.iter_content(chunk_size=None):
-                content += chunk
-                if len(content) > settings.BASEROW_FILE_UPLOAD_SIZE_LIMIT_MB:
+            size = 0
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                size += len(chunk)
+                if size > settings.BASEROW_FILE_UPLOAD_SIZE_LIMIT_MB:
                     response.close()
                     raise FileSizeTooLargeError(
                         settings.BASEROW_FILE_UPLOAD_SIZE_LIMIT_MB,
                         "The provided file is too large.",
                     )
+                content.write(chunk)
         except (RequestException, UnacceptableAddressException, ConnectionError):
+            content.close()
             raise FileURLCouldNotBeReached("The provided URL could not be reached.")
+        except Exception:
+            content.close()
+            raise
 
-        file = SimpleUploadedFile(file_name, content)
+        content.seek(0)
+        file = File(content, name=file_name)
         return UserFileHandler().upload_user_file(user, file_name, file, storage)
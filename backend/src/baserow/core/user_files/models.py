@@ -22,6 +22,11 @@ class UserFile(models.Model):
     uploaded_at = models.DateTimeField(auto_now_add=True)
     uploaded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     sha256_hash = models.CharField(max_length=64, db_index=True)
+    thumbnails_generated_at = models.DateTimeField(
+        null=True,
+        help_text="The last time the thumbnails of the file have been generated. "
+        "Stays empty while the thumbnails are still being generated.",
+    )
 
     objects = UserFileQuerySet.as_manager()
 
@@ -31,7 +36,8 @@ class UserFile(models.Model):
     def serialize(self):
         """
         Generates a serialized version that can be stored in other data sources. This
-        is possible because the state of the UserFile never changes.
+        is possible because the state of the UserFile never changes, except for the
+        `thumbnails_generated_at` once the thumbnails have been generated.
 
         :return: The serialized version.
         :rtype: dict
@@ -45,6 +51,11 @@ class UserFile(models.Model):
             "image_width": self.image_width,
             "image_height": self.image_height,
             "uploaded_at": self.uploaded_at.isoformat(),
+            "thumbnails_generated_at": (
+                self.thumbnails_generated_at.isoformat()
+                if self.thumbnails_generated_at
+                else None
+            ),
         }
 
     @property
@@ -0,0 +1,21 @@
+from baserow.config.celery import app
+
+
+@app.task(bind=True)
+def generate_user_file_thumbnails(self, user_file_id: int):
+    """
+    Generates and saves the thumbnails of an uploaded user file. This is done
+    asynchronously so that the upload doesn't have to wait for it.
+
+    :param user_file_id: The id of the user file to generate the thumbnails for.
+    """
+
+    from .handler import UserFileHandler
+    from .models import UserFile
+
+    try:
+        user_file = UserFile.objects.get(id=user_file_id)
+    except UserFile.DoesNotExist:
+        return
+
+    UserFileHandler().generate_and_save_stored_file_thumbnails(user_file)
@@ -214,6 +214,17 @@ def sha256_hash(stream, block_size=65536):
     """
 
     stream.seek(0)
+
+    # Python 3.11+ can hash binary file objects in C with a single reused buffer.
+    if hasattr(hashlib, "file_digest"):
+        try:
+            hexdigest = hashlib.file_digest(stream, "sha256").hexdigest()
+            stream.seek(0)
+            return hexdigest
+        except ValueError:
+            # The stream isn't a binary file object that `file_digest` supports.
+            pass
+
     hasher = hashlib.sha256()
     for stream_chunk in iter(lambda: stream.read(block_size), b""):
         hasher.update(stream_chunk)
@@ -1,11 +1,15 @@
 from datetime import date, datetime, timedelta
 from decimal import Decimal
+from unittest.mock import patch
 
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.shortcuts import reverse
 
 import pytest
 from faker import Faker
 from freezegun import freeze_time
+from PIL import Image
 from pytz import timezone
 from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
 
@@ -493,6 +497,7 @@ def test_file_field_type(api_client, data_fixture):
             sha256_hash=(
                 "a591a6d40bf420404a011733cfb7b190d62c65bf0bcda32b57b277d9ad9f146e"
             ),
+            thumbnails_generated_at=datetime(2020, 1, 1, 12, tzinfo=timezone("UTC")),
         )
 
     user_file_2 = data_fixture.create_user_file()
@@ -715,6 +720,60 @@ def test_file_field_type(api_client, data_fixture):
     )
 
 
+@pytest.mark.django_db
+def test_file_field_thumbnails_generated_after_upload(
+    api_client, data_fixture, tmpdir, django_capture_on_commit_callbacks
+):
+    user, token = data_fixture.create_user_and_token()
+    table = data_fixture.create_database_table(user=user)
+    field = data_fixture.create_file_field(table=table)
+    storage = FileSystemStorage(location=str(tmpdir), base_url="http://localhost")
+
+    image = Image.new("RGB", (100, 140), color="red")
+    file = SimpleUploadedFile("test.png", b"")
+    image.save(file, format="PNG")
+    file.seek(0)
+
+    with patch("baserow.core.user_files.handler.default_storage", new=storage):
+        with django_capture_on_commit_callbacks() as callbacks:
+            response = api_client.post(
+                reverse("api:user_files:upload_file"),
+                data={"file": file},
+                format="multipart",
+                HTTP_AUTHORIZATION=f"JWT {token}",
+            )
+        assert response.status_code == HTTP_200_OK
+        assert response.json()["thumbnails"] is None
+        name = response.json()["name"]
+
+        response = api_client.post(
+            reverse("api:database:rows:list", kwargs={"table_id": table.id}),
+            {f"field_{field.id}": [{"name": name}]},
+            format="json",
+            HTTP_AUTHORIZATION=f"JWT {token}",
+        )
+        assert response.status_code == HTTP_200_OK
+        row_id = response.json()["id"]
+        # The thumbnails don't exist yet, so they must not be in the response.
+        assert response.json()[f"field_{field.id}"][0]["thumbnails"] is None
+
+        for callback in callbacks:
+            callback()
+
+    response = api_client.get(
+        reverse(
+            "api:database:rows:item",
+            kwargs={"table_id": table.id, "row_id": row_id},
+        ),
+        HTTP_AUTHORIZATION=f"JWT {token}",
+    )
+    assert response.status_code == HTTP_200_OK
+    thumbnails = response.json()[f"field_{field.id}"][0]["thumbnails"]
+    assert thumbnails["tiny"]["width"] == 21
+    assert thumbnails["tiny"]["height"] == 21
+    assert tmpdir.join("thumbnails", "tiny", name).isfile()
+
+
 @pytest.mark.django_db
 def test_number_field_type(api_client, data_fixture):
     user, token = data_fixture.create_user_and_token(
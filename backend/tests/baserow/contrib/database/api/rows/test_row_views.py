@@ -2049,3 +2049,19 @@ def test_get_row_adjacent_search(api_client, data_fixture):
         HTTP_AUTHORIZATION=f"JWT {jwt_token}",
     )
     assert response.status_code == HTTP_204_NO_CONTENT
+
+
+@pytest.mark.django_db
+def test_list_rows_by_table_api_name(api_client, data_fixture):
+    user, jwt_token = data_fixture.create_user_and_token()
+    table = data_fixture.create_database_table(user=user, api_name="my_table")
+    data_fixture.create_text_field(name="Name", table=table, primary=True)
+    model = table.get_model()
+    row = model.objects.create()
+
+    url = reverse("api:database:rows:list", kwargs={"table_id": "my_table"})
+    assert url.endswith("/table/my_table/")
+    response = api_client.get(url, HTTP_AUTHORIZATION=f"JWT {jwt_token}")
+    assert response.status_code == HTTP_200_OK
+    assert response.json()["count"] == 1
+    assert response.json()["results"][0]["id"] == row.id
@@ -18,6 +18,7 @@ from rest_framework.status import (
     HTTP_413_REQUEST_ENTITY_TOO_LARGE,
 )
 
+from baserow.api.user_files.serializers import UserFileSerializer
 from baserow.contrib.database.views.models import (
     FormView,
     FormViewFieldOptions,
@@ -1704,7 +1705,9 @@ def test_submit_form_view_for_required_number_field_with_0(api_client, data_fixt
 
 
 @pytest.mark.django_db
-def test_upload_file_view(api_client, data_fixture, tmpdir):
+def test_upload_file_view(
+    api_client, data_fixture, tmpdir, django_capture_on_commit_callbacks
+):
     user, token = data_fixture.create_user_and_token(
         email="test@test.nl", password="password", first_name="Test1"
     )
@@ -1819,7 +1822,9 @@ def test_upload_file_view(api_client, data_fixture, tmpdir):
     image.save(file, format="PNG")
     file.seek(0)
 
-    with patch("baserow.core.user_files.handler.default_storage", new=storage):
+    with patch(
+        "baserow.core.user_files.handler.default_storage", new=storage
+    ), django_capture_on_commit_callbacks(execute=True):
         response = api_client.post(
             reverse(
                 "api:database:views:form:upload_file",
@@ -1836,14 +1841,18 @@ def test_upload_file_view(api_client, data_fixture, tmpdir):
     assert response_json["is_image"] is True
     assert response_json["image_width"] == 100
     assert response_json["image_height"] == 140
-    assert len(response_json["thumbnails"]) == 1
-    assert "localhost:8000" in response_json["thumbnails"]["tiny"]["url"]
-    assert "tiny" in response_json["thumbnails"]["tiny"]["url"]
-    assert response_json["thumbnails"]["tiny"]["width"] == 21
-    assert response_json["thumbnails"]["tiny"]["height"] == 21
+    # The thumbnails are generated after the response has been serialized.
+    assert response_json["thumbnails"] is None
+    assert response_json["thumbnails_generated_at"] is None
     assert response_json["original_name"] == "test.png"
 
     user_file = UserFile.objects.all().last()
+    thumbnails = UserFileSerializer(user_file).data["thumbnails"]
+    assert len(thumbnails) == 1
+    assert "localhost:8000" in thumbnails["tiny"]["url"]
+    assert "tiny" in thumbnails["tiny"]["url"]
+    assert thumbnails["tiny"]["width"] == 21
+    assert thumbnails["tiny"]["height"] == 21
     file_path = tmpdir.join("user_files", user_file.name)
     assert file_path.isfile()
     file_path = tmpdir.join("thumbnails", "tiny", user_file.name)
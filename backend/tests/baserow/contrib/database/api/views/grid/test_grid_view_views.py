@@ -2499,3 +2499,26 @@ def test_user_with_wrong_password_cant_get_info_about_a_public_password_protecte
         format="json",
     )
     assert response.status_code == HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_field_aggregation_by_field_api_name(api_client, data_fixture):
+    user, token = data_fixture.create_user_and_token()
+    table = data_fixture.create_database_table(user=user)
+    text_field = data_fixture.create_text_field(table=table, api_name="field_color")
+    grid = data_fixture.create_grid_view(table=table)
+    model = grid.table.get_model()
+    model.objects.create(**{f"field_{text_field.id}": "Green"})
+    model.objects.create(**{f"field_{text_field.id}": ""})
+
+    url = reverse(
+        "api:database:views:grid:field-aggregation",
+        kwargs={"view_id": grid.id, "field_id": "field_color"},
+    )
+    assert url.endswith("/aggregation/field_color/")
+    response = api_client.get(
+        url + "?type=empty_count",
+        **{"HTTP_AUTHORIZATION": f"JWT {token}"},
+    )
+    assert response.status_code == HTTP_200_OK
+    assert response.json() == {"value": 1}
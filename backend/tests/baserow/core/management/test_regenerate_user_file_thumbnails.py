@@ -0,0 +1,172 @@
+from concurrent.futures import Future
+from contextlib import contextmanager
+from io import BytesIO
+from unittest.mock import patch
+
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+
+import pytest
+from PIL import Image
+
+from baserow.core.user_files.handler import UserFileHandler
+
+
+class InlineExecutor:
+    """
+    Runs the submitted functions right away in the current process, because spawned
+    worker processes can't access the test database.
+    """
+
+    def __init__(self, max_workers, mp_context, initializer):
+        self.max_workers = max_workers
+        self.submitted = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def submit(self, fn, *args):
+        self.submitted.append(args)
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+
+@pytest.fixture
+def patch_executor():
+    """
+    Replaces the process pool of the command with the provided executor class and
+    returns the list of the created executors, so that they can be inspected.
+    """
+
+    @contextmanager
+    def patch_process_pool(executor_class):
+        executors = []
+
+        def create_executor(*args, **kwargs):
+            executor = executor_class(*args, **kwargs)
+            executors.append(executor)
+            return executor
+
+        with patch(
+            "baserow.core.management.commands.regenerate_user_file_thumbnails."
+            "ProcessPoolExecutor",
+            new=create_executor,
+        ):
+            yield executors
+
+    return patch_process_pool
+
+
+@pytest.mark.django_db
+def test_regenerate_user_file_thumbnails(data_fixture, tmpdir, capsys, patch_executor):
+    user = data_fixture.create_user()
+    storage = FileSystemStorage(location=str(tmpdir), base_url="http://localhost")
+    handler = UserFileHandler()
+
+    user_files = []
+    for index in range(3):
+        image = Image.new("RGB", (100, 140), color="red")
+        image_bytes = BytesIO()
+        image.save(image_bytes, format="PNG")
+        user_files.append(
+            handler.upload_user_file(
+                user, f"image_{index}.png", image_bytes, storage=storage
+            )
+        )
+
+    for user_file in user_files:
+        tmpdir.join("thumbnails", "tiny", user_file.name).remove()
+
+    with patch(
+        "baserow.core.management.commands.regenerate_user_file_thumbnails."
+        "default_storage",
+        new=storage,
+    ), patch_executor(InlineExecutor) as executors:
+        call_command("regenerate_user_file_thumbnails", "tiny", workers=1)
+
+    assert len(executors) == 1
+    assert executors[0].max_workers == 1
+    assert executors[0].submitted == [
+        (user_file.id, "tiny") for user_file in user_files
+    ]
+    for user_file in user_files:
+        file_path = tmpdir.join("thumbnails", "tiny", user_file.name)
+        assert file_path.isfile()
+        thumbnail = Image.open(file_path.open("rb"))
+        assert thumbnail.width == 21
+        assert thumbnail.height == 21
+
+    captured = capsys.readouterr()
+    assert "3 thumbnails have been regenerated, 0 failed." in captured.out
+
+
+@pytest.mark.django_db
+def test_regenerate_user_file_thumbnails_continues_after_failure(
+    data_fixture, capsys, patch_executor
+):
+    user_file_1 = data_fixture.create_user_file(is_image=True)
+    data_fixture.create_user_file(is_image=True)
+
+    def regenerate(user_file, storage=None, only_with_name=None):
+        if user_file.id == user_file_1.id:
+            raise ValueError("Broken image.")
+        return True
+
+    with patch_executor(InlineExecutor), patch.object(
+        UserFileHandler,
+        "generate_and_save_stored_file_thumbnails",
+        side_effect=regenerate,
+    ) as generate:
+        call_command("regenerate_user_file_thumbnails", workers=2)
+
+    assert generate.call_count == 2
+    captured = capsys.readouterr()
+    assert f"{user_file_1.id}: Broken image." in captured.err
+    assert "1 thumbnails have been regenerated, 1 failed." in captured.out
+
+
+class DeferredExecutor(InlineExecutor):
+    """
+    Only runs the submitted functions when they're waited for, so that the amount of
+    pending futures can be inspected.
+    """
+
+    def submit(self, fn, *args):
+        self.submitted.append(args)
+        future = Future()
+        future.run = lambda: future.set_result(fn(*args))
+        return future
+
+
+@pytest.mark.django_db
+def test_regenerate_user_file_thumbnails_streams_user_file_ids(
+    data_fixture, patch_executor
+):
+    for _ in range(10):
+        data_fixture.create_user_file(is_image=True)
+
+    pending_sizes = []
+
+    def wait(futures, return_when):
+        pending_sizes.append(len(futures))
+        future = next(iter(futures))
+        future.run()
+        return {future}, set(futures) - {future}
+
+    with patch_executor(DeferredExecutor) as executors, patch(
+        "baserow.core.management.commands.regenerate_user_file_thumbnails.wait",
+        new=wait,
+    ), patch.object(
+        UserFileHandler, "generate_and_save_stored_file_thumbnails", return_value=True
+    ):
+        call_command("regenerate_user_file_thumbnails", workers=1)
+
+    assert len(executors[0].submitted) == 10
+    assert max(pending_sizes) == 4
@@ -0,0 +1,52 @@
+# noinspection PyPep8Naming
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+import pytest
+
+migrate_from = [("core", "0046_userfile_thumbnails_generated_at")]
+migrate_to = [("core", "0047_backfill_userfile_thumbnails_generated_at")]
+
+
+# noinspection PyPep8Naming
+@pytest.mark.django_db(transaction=True)
+def test_backfill_userfile_thumbnails_generated_at(
+    data_fixture, reset_schema_after_module
+):
+    old_state = migrate(migrate_from)
+
+    UserFile = old_state.apps.get_model("core", "UserFile")
+
+    def create_user_file(unique, mime_type, is_image):
+        return UserFile.objects.create(
+            original_name=f"{unique}.file",
+            original_extension="file",
+            unique=unique,
+            size=0,
+            mime_type=mime_type,
+            is_image=is_image,
+            sha256_hash="hash",
+        )
+
+    image = create_user_file("image", "image/png", True)
+    document = create_user_file("document", "application/pdf", False)
+    text = create_user_file("text", "text/plain", False)
+    assert UserFile.objects.filter(thumbnails_generated_at__isnull=True).count() == 3
+
+    new_state = migrate(migrate_to)
+
+    MigrationUserFile = new_state.apps.get_model("core", "UserFile")
+    image = MigrationUserFile.objects.get(id=image.id)
+    assert image.thumbnails_generated_at == image.uploaded_at
+    document = MigrationUserFile.objects.get(id=document.id)
+    assert document.thumbnails_generated_at == document.uploaded_at
+    text = MigrationUserFile.objects.get(id=text.id)
+    assert text.thumbnails_generated_at is None
+
+
+def migrate(target):
+    executor = MigrationExecutor(connection)
+    executor.loader.build_graph()  # reload.
+    executor.migrate(target)
+    new_state = executor.loader.project_state(target)
+    return new_state
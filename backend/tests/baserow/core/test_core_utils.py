@@ -1,6 +1,7 @@
 from io import BytesIO
 from unittest.mock import MagicMock, patch
 
+from django.core.files.base import ContentFile
 from django.db import OperationalError
 
 import pytest
@@ -89,6 +90,13 @@ def test_sha256_hash():
         "a591a6d40bf420404a011733cfb7b190d62c65bf0bcda32b57b277d9ad9f146e"
     )
 
+    stream = ContentFile(b"Hello World")
+    stream.read(5)
+    assert sha256_hash(stream) == (
+        "a591a6d40bf420404a011733cfb7b190d62c65bf0bcda32b57b277d9ad9f146e"
+    )
+    assert stream.tell() == 0
+
 
 def test_stream_size():
     assert stream_size(BytesIO(b"test")) == 4
@@ -1,5 +1,6 @@
 import string
 from io import BytesIO
+from unittest.mock import patch
 
 from django.conf import settings
 from django.core.files.base import ContentFile
@@ -9,8 +10,10 @@ import httpretty
 import pytest
 import responses
 from freezegun import freeze_time
+from pdf2image import convert_from_path
 from PIL import Image
 
+from baserow.config.celery import app
 from baserow.core.models import UserFile
 from baserow.core.user_files.exceptions import (
     FileSizeTooLargeError,
@@ -19,7 +22,15 @@ from baserow.core.user_files.exceptions import (
     InvalidFileURLError,
     MaximumUniqueTriesError,
 )
-from baserow.core.user_files.handler import UserFileHandler
+from baserow.core.user_files.handler import (
+    UserFileHandler,
+    convert_document_to_image,
+    convert_pdf_to_image,
+    get_extension_and_mime_type,
+    guess_mime_type,
+    open_image,
+)
+from baserow.core.user_files.tasks import generate_user_file_thumbnails
 
 
 @pytest.mark.django_db
@@ -32,6 +43,91 @@ def test_user_file_path(data_fixture):
     assert handler.user_file_path(user_file) == f"user_files/{user_file.name}"
 
 
+def test_guess_mime_type():
+    assert guess_mime_type("test.jpg") == "image/jpeg"
+    assert guess_mime_type("test.JPG") == "image/jpeg"
+    assert guess_mime_type("user_files/test.pdf") == "application/pdf"
+    assert guess_mime_type("test.tar.gz") == "application/x-tar"
+    assert guess_mime_type("test") is None
+    assert guess_mime_type("test.unknown_extension") is None
+
+
+def test_get_extension_and_mime_type():
+    assert get_extension_and_mime_type("test.JPG") == ("jpg", "image/jpeg")
+    assert get_extension_and_mime_type("some file.txt") == ("txt", "text/plain")
+    assert get_extension_and_mime_type("archive.tar.gz") == ("gz", "application/x-tar")
+    assert get_extension_and_mime_type("test") == ("", None)
+    assert get_extension_and_mime_type("test.") == ("", None)
+
+
+def test_open_image():
+    png = BytesIO()
+    Image.new("RGB", (10, 20)).save(png, format="PNG")
+
+    with patch("baserow.core.user_files.handler.Image.open", wraps=Image.open) as o:
+        image = open_image(png, "image/png")
+        assert image.format == "PNG"
+        assert image.size == (10, 20)
+        o.assert_called_once_with(png, formats=["PNG"])
+
+    # A wrong extension must fall back to probing all the formats.
+    png.seek(0)
+    image = open_image(png, "image/jpeg")
+    assert image.format == "PNG"
+
+    png.seek(0)
+    assert open_image(png, None).format == "PNG"
+
+    with pytest.raises(IOError):
+        open_image(BytesIO(b"not an image"), "image/png")
+
+
+def test_convert_pdf_to_image_only_uses_first_page():
+    first_page = Image.new("RGB", (100, 200), color="red")
+    second_page = Image.new("RGB", (200, 100), color="blue")
+    pdf_bytes = BytesIO()
+    first_page.save(pdf_bytes, format="PDF", save_all=True, append_images=[second_page])
+
+    with patch(
+        "baserow.core.user_files.handler.convert_from_path", wraps=convert_from_path
+    ) as convert:
+        image = convert_pdf_to_image(pdf_bytes)
+        convert.assert_called_once()
+        assert convert.call_args.kwargs["first_page"] == 1
+        assert convert.call_args.kwargs["last_page"] == 1
+
+    assert image.format == "JPEG"
+    assert image.height > image.width
+    assert pdf_bytes.tell() == 0
+
+
+def test_convert_document_to_image_only_uses_first_page(tmpdir):
+    first_page = Image.new("RGB", (100, 200), color="red")
+    second_page = Image.new("RGB", (200, 100), color="blue")
+    pdf_path = str(tmpdir.join("document.pdf"))
+    first_page.save(pdf_path, format="PDF", save_all=True, append_images=[second_page])
+    convert_output = (
+        f"convert document.docx -> {pdf_path} using filter : writer_pdf_Export"
+    )
+
+    with patch(
+        "baserow.core.user_files.handler.check_output",
+        return_value=convert_output.encode("utf-8"),
+    ), patch(
+        "baserow.core.user_files.handler.convert_from_path", wraps=convert_from_path
+    ) as convert:
+        image = convert_document_to_image(
+            BytesIO(b"document"),
+            "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        )
+        convert.assert_called_once()
+        assert convert.call_args.args[0] == pdf_path
+        assert convert.call_args.kwargs["first_page"] == 1
+        assert convert.call_args.kwargs["last_page"] == 1
+
+    assert image.height > image.width
+
+
 @pytest.mark.django_db
 def test_user_file_thumbnail_path(data_fixture):
     handler = UserFileHandler()
@@ -43,6 +139,14 @@ def test_user_file_thumbnail_path(data_fixture):
         handler.user_file_thumbnail_path("another_file.png", "small")
         == "thumbnails/small/another_file.png"
     )
+    assert (
+        handler.user_file_thumbnail_path("document.v2.docx", "small")
+        == "thumbnails/small/document.v2.jpg"
+    )
+    assert (
+        handler.user_file_thumbnail_path("file.pdf", "tiny")
+        == "thumbnails/tiny/file.jpg"
+    )
 
     user_file = data_fixture.create_user_file()
     assert (
@@ -52,7 +156,7 @@ def test_user_file_thumbnail_path(data_fixture):
 
 
 @pytest.mark.django_db
-def test_generate_unique(data_fixture):
+def test_generate_unique(data_fixture, django_assert_num_queries):
     user = data_fixture.create_user()
     handler = UserFileHandler()
 
@@ -73,6 +177,10 @@ def test_generate_unique(data_fixture):
     with pytest.raises(MaximumUniqueTriesError):
         handler.generate_unique("test", "txt", 1, 3)
 
+    # All the tries of a batch are checked with a single query.
+    with django_assert_num_queries(1), pytest.raises(MaximumUniqueTriesError):
+        handler.generate_unique("test", "txt", 1, 15)
+
     handler.generate_unique("test2", "txt", 1, 3)
     handler.generate_unique("test", "txt2", 1, 3)
 
@@ -202,6 +310,47 @@ def test_upload_user_file(data_fixture, tmpdir):
 
     assert UserFile.objects.all().count() == 7
 
+    settings.USER_THUMBNAILS = {"tiny": [None, 100], "tiny_square": [21, 21]}
+    image = Image.new("RGB", (1920, 1080), color="red")
+    image_bytes = BytesIO()
+    image.save(image_bytes, format="JPEG")
+    user_file = handler.upload_user_file(user, "red.jpg", image_bytes, storage=storage)
+    assert user_file.image_width == 1920
+    assert user_file.image_height == 1080
+    thumbnail = Image.open(tmpdir.join("thumbnails", "tiny", user_file.name).open("rb"))
+    assert thumbnail.format == "JPEG"
+    assert thumbnail.width == 178
+    assert thumbnail.height == 100
+    thumbnail = Image.open(
+        tmpdir.join("thumbnails", "tiny_square", user_file.name).open("rb")
+    )
+    assert thumbnail.width == 21
+    assert thumbnail.height == 21
+    settings.USER_THUMBNAILS = old_thumbnail_settings
+
+    settings.USER_THUMBNAILS = {
+        "tiny": [None, 21],
+        "small": [None, 48],
+        "medium": [None, 320],
+        "large": [None, 640],
+    }
+    image = Image.new("RGB", (259, 1045), color="red")
+    image_bytes = BytesIO()
+    image.save(image_bytes, format="PNG")
+    user_file = handler.upload_user_file(user, "tall.png", image_bytes, storage=storage)
+    for name, width, height in [
+        ("tiny", 5, 21),
+        ("small", 12, 48),
+        ("medium", 79, 320),
+        ("large", 159, 640),
+    ]:
+        thumbnail = Image.open(
+            tmpdir.join("thumbnails", name, user_file.name).open("rb")
+        )
+        assert thumbnail.width == width
+        assert thumbnail.height == height
+    settings.USER_THUMBNAILS = old_thumbnail_settings
+
     image = Image.new("RGB", (1, 1), color="red")
     image_bytes = BytesIO()
     image.save(image_bytes, format="PNG")
@@ -219,6 +368,46 @@ def test_upload_user_file(data_fixture, tmpdir):
     )
 
 
+@pytest.mark.django_db
+def test_upload_user_file_generates_thumbnails_async(
+    data_fixture, tmpdir, django_capture_on_commit_callbacks
+):
+    user = data_fixture.create_user()
+
+    storage = FileSystemStorage(location=str(tmpdir), base_url="http://localhost")
+    handler = UserFileHandler()
+
+    image = Image.new("RGB", (100, 140), color="red")
+    image_bytes = BytesIO()
+    image.save(image_bytes, format="PNG")
+
+    with patch(
+        "baserow.core.user_files.handler.default_storage", new=storage
+    ), django_capture_on_commit_callbacks() as callbacks:
+        user_file = handler.upload_user_file(user, "image.png", image_bytes)
+
+        assert user_file.thumbnails_generated_at is None
+        assert tmpdir.join("user_files", user_file.name).isfile()
+        assert not tmpdir.join("thumbnails", "tiny", user_file.name).isfile()
+
+        for callback in callbacks:
+            callback()
+
+    user_file.refresh_from_db()
+    assert user_file.thumbnails_generated_at is not None
+    file_path = tmpdir.join("thumbnails", "tiny", user_file.name)
+    assert file_path.isfile()
+    thumbnail = Image.open(file_path.open("rb"))
+    assert thumbnail.height == 21
+    assert thumbnail.width == 21
+
+
+def test_generate_user_file_thumbnails_task_is_routed_to_its_own_queue():
+    route = app.amqp.router.route({}, generate_user_file_thumbnails.name)
+    assert route["queue"].name == settings.BASEROW_USER_FILE_THUMBNAILS_QUEUE
+    assert route["queue"].name not in ("celery", "export")
+
+
 @pytest.mark.django_db
 @httpretty.activate(verbose=True, allow_net_connect=False)
 def test_upload_user_file_by_url(data_fixture, tmpdir):
@@ -26,8 +26,14 @@ def test_serialize_user_file():
         "image_width": 100,
         "image_height": 100,
         "uploaded_at": user_file.uploaded_at.isoformat(),
+        "thumbnails_generated_at": None,
     }
 
+    user_file.thumbnails_generated_at = user_file.uploaded_at
+    assert user_file.serialize()["thumbnails_generated_at"] == (
+        user_file.uploaded_at.isoformat()
+    )
+
 
 @pytest.mark.django_db
 def test_user_file_name():
@@ -70,7 +70,10 @@ class AuditLogHandler:
     @classmethod
     def delete_entries_older_than(cls, cutoff: datetime):
         """
-        Deletes all audit log entries that are older than the given number of days.
+        Deletes all audit log entries that are older than the given cutoff. Nothing
+        references the entries and no delete signals are connected, so Django
+        removes them with a single DELETE query that uses the `action_timestamp`
+        index, without fetching them first.
 
         :param cutoff: The date and time before which all entries will be deleted.
         """
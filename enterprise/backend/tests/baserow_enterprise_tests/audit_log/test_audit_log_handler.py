@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timezone
 
 from django.test.utils import override_settings
 
@@ -63,6 +63,34 @@ def test_audit_log_handler_can_clear_entries_older_than(
     assert AuditLogEntry.objects.count() == 0
 
 
+@pytest.mark.django_db
+def test_audit_log_handler_clears_entries_older_than_in_a_single_query(
+    django_assert_num_queries,
+):
+    AuditLogEntry.objects.bulk_create(
+        [
+            AuditLogEntry(
+                action_type="create_group",
+                action_timestamp=datetime(2023, 1, 1, 12, 0, 0, tzinfo=timezone.utc),
+            )
+            for _ in range(1000)
+        ]
+        + [
+            AuditLogEntry(
+                action_type="create_group",
+                action_timestamp=datetime(2023, 1, 3, 12, 0, 0, tzinfo=timezone.utc),
+            )
+        ]
+    )
+
+    with django_assert_num_queries(1):
+        AuditLogHandler.delete_entries_older_than(
+            datetime(2023, 1, 2, 12, 0, 0, tzinfo=timezone.utc)
+        )
+
+    assert AuditLogEntry.objects.count() == 1
+
+
 @pytest.mark.django_db
 @pytest.mark.undo_redo
 @override_settings(DEBUG=True)